@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Measures the import time and cold start time of the command line entry
+points, and the time for scanning a directory with and without the
+sequence cache.
+
+usage: bench_startup.py [directory]
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import sequence
+
+
+def _timed_run(args, repeat, devnull):
+    best = None
+    for i in xrange(repeat):
+        start = time.time()
+        subprocess.call(args, stdout=devnull, stderr=subprocess.STDOUT)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def _timed_call(func, repeat, setup=None):
+    best = None
+    for i in xrange(repeat):
+        if setup is not None:
+            setup()
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def _main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    repeat = 10
+    devnull = open(os.devnull, 'w')
+    # All times are the full process run time.  The eager imports are
+    # what the entry points loaded at startup before the imports were
+    # made lazy.
+    imports = [
+        ('interpreter startup:', 'pass'),
+        ('import eager modules:', 'import optparse, re, asynproc, coding, sequence'),
+        ('import command:', 'import command'),
+        ('import encode_seq:', 'import encode_seq'),
+        ('import coding:', 'import coding'),
+        ]
+    for label, statement in imports:
+        elapsed = _timed_run([sys.executable, '-c', 'import sys; sys.path.insert(0, %r); %s'
+                              % (here, statement)], repeat, devnull)
+        print '%-25s %7.1f ms' % (label, elapsed * 1000)
+    for script in ['command.py', 'encode_seq.py']:
+        elapsed = _timed_run([sys.executable, os.path.join(here, script), '--help'], repeat, devnull)
+        print '%-25s %7.1f ms' % (script + ' --help:', elapsed * 1000)
+
+    if len(sys.argv) > 1:
+        directory = sys.argv[1]
+        tmp_dir = None
+    else:
+        tmp_dir = tempfile.mkdtemp()
+        directory = tmp_dir
+        for i in xrange(10000):
+            open(os.path.join(directory, 'frame.%05d.png' % i), 'w').close()
+        os.utime(directory, (time.time() - 10,) * 2)
+    os.environ['XDG_CACHE_HOME'] = cache_dir = tempfile.mkdtemp()
+    try:
+        clear_cache = lambda: shutil.rmtree(os.path.join(cache_dir, 'videotool'), True)
+        uncached = _timed_call(lambda: sequence.directory_sequences(directory), 3, clear_cache)
+        sequence.directory_sequences(directory)
+        cached = _timed_call(lambda: sequence.directory_sequences(directory), repeat)
+        print 'scan %-20s %7.1f ms' % ('(no cache):', uncached * 1000)
+        print 'scan %-20s %7.1f ms' % ('(cached):', cached * 1000)
+    finally:
+        devnull.close()
+        shutil.rmtree(cache_dir)
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__=='__main__':
+    _main()
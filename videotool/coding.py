@@ -1,13 +1,13 @@
 
+import copy
 import os
 import re
 import subprocess
 
-import sequence
 import asynproc
 
 from asynproc import which
-from coding_sequence import sequence_as_str_repr
+from coding_sequence import parse_rate, sequence_as_str_repr, timecode_file, unique_frames
 
 
 class X264Handler(asynproc.ProcessHandlerBase):
@@ -78,6 +78,9 @@ def decode_to_yuv_mplayer(input, output, **options):
 def decode_to_yuv_ffmpeg(input, output, **options):
     for opt, val in [('f', 'yuv4mpegpipe'), ('pix_fmt', 'yuv420p'), ('y', True)]:
         options.setdefault(opt, val)
+    input_list = []
+    if 'framerate' in options:
+        input_list = ['-framerate', str(options.pop('framerate'))]
     option_list = []
     for k, v in options.iteritems():
         if v is True:
@@ -85,7 +88,7 @@ def decode_to_yuv_ffmpeg(input, output, **options):
         else:
             option_list.append('-'+k)
             option_list.append(str(v))
-    return asynproc.run_process([which('ffmpeg'), '-i', input] + option_list + [output])
+    return asynproc.run_process([which('ffmpeg')] + input_list + ['-i', input] + option_list + [output])
 
 
 def encode_yuv_to_h264(input, output, **options):
@@ -102,18 +105,61 @@ def encode_yuv_to_h264(input, output, **options):
     return asynproc.run_process([which('x264'), '--output', output, input] + option_list)
 
 
-def encode_h264(input, output, decode_options=None, encode_options=None):
+def _sequence_rate_options(options, decoder_type):
+    # Image sequences have no timing of their own.  The frame rate is
+    # given to the demuxer, instead of converting the default input rate
+    # of 25 fps to the output rate by dropping or duplicating frames.
+    if 'r' not in options:
+        return options
+    options = dict(options)
+    if decoder_type == 'mplayer':
+        rate = parse_rate(options['r'])
+        if rate is not None:
+            del options['r']
+            options['mf'] = 'fps=%.6f' % rate
+    else:
+        options['framerate'] = options.pop('r')
+    return options
+
+
+def encode_h264(input, output, decode_options=None, encode_options=None,
+                drop_duplicates=False):
     if decode_options is None:
         decode_options = OptionsBase()
     if encode_options is None:
         encode_options = OptionsBase()
     decode_options.options = getattr(decode_options, 'options', {})
     encode_options.options = getattr(encode_options, 'options', {})
+    if drop_duplicates and isinstance(input, list):
+        fps = parse_rate(decode_options.options.get('r', 25))
+        if fps is not None:
+            frames = unique_frames(input)
+            if len(frames) < len(input):
+                _encode_h264_vfr(frames, fps, output, decode_options, encode_options)
+                return
+    _encode_h264(input, output, decode_options, encode_options)
+
+
+def _encode_h264_vfr(frames, fps, output, decode_options, encode_options):
+    # Only the unique frames are decoded, the held frames are restored
+    # by the timecode file.
+    with timecode_file(frames, fps) as timecodes:
+        encode_options = copy.copy(encode_options)
+        encode_options.options = dict(encode_options.options)
+        encode_options.options['tcfile-in'] = timecodes
+        _encode_h264([name for name, count in frames], output,
+                     decode_options, encode_options)
+
+
+def _encode_h264(input, output, decode_options, encode_options):
     decoder_type = decode_options.options.get('type', 'ffmpeg')
+    decode_opts = decode_options.options
+    if isinstance(input, list):
+        decode_opts = _sequence_rate_options(decode_opts, decoder_type)
     with sequence_as_str_repr(input, decoder_type) as input:
         with asynproc.fifo_handle('video.y4m') as named_pipe:
             with encode_yuv_to_h264(named_pipe, output, **encode_options.options) as encoder:
-                with decode_to_yuv(input, named_pipe, **decode_options.options) as decoder:
+                with decode_to_yuv(input, named_pipe, **decode_opts) as decoder:
                     if decoder_type == 'mplayer':
                         decoder_handler = MPlayerHandler
                     else:
@@ -133,8 +179,11 @@ def encode_yuv(input, output, decode_options=None):
     for opt, val in [('f', 'mov'), ('vcodec', 'rawvideo'), ('pix_fmt', 'uyvy422'), ('vtag', '2vuy'), ('y', True)]:
         decode_options.options.setdefault(opt, val)
     decoder_type = decode_options.options.get('type', 'ffmpeg')
+    decode_opts = decode_options.options
+    if isinstance(input, list):
+        decode_opts = _sequence_rate_options(decode_opts, 'ffmpeg')
     with sequence_as_str_repr(input, decoder_type) as input:
-        with decode_to_yuv_ffmpeg(input, output, **decode_options.options) as decoder:
+        with decode_to_yuv_ffmpeg(input, output, **decode_opts) as decoder:
             decoder_handler = FFmpegHandler(decoder, decode_options.status,
                                             decode_options.error)
             asynproc.loop()
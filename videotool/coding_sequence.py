@@ -1,8 +1,11 @@
 
 import contextlib
+import hashlib
 import os
 import tempfile
 
+from fractions import Fraction
+
 
 @contextlib.contextmanager
 def _sequence_links(names):
@@ -53,3 +56,168 @@ def sequence_as_str_repr(input, type):
     else:
         yield input
 
+
+def _runs(keys):
+    """
+    Groups consecutive equal keys, returning (start, length) pairs.
+
+    >>> _runs(['a', 'a', 'b', 'a', 'a', 'a'])
+    [(0, 2), (2, 1), (3, 3)]
+    >>> _runs([])
+    []
+    """
+    result = []
+    for i, key in enumerate(keys):
+        if result and keys[result[-1][0]] == key:
+            result[-1] = (result[-1][0], result[-1][1] + 1)
+        else:
+            result.append((i, 1))
+    return result
+
+
+def _file_hash(name, block_size=1<<20):
+    digest = hashlib.sha1()
+    with open(name, 'rb') as f:
+        block = f.read(block_size)
+        while block:
+            digest.update(block)
+            block = f.read(block_size)
+    return digest.digest()
+
+
+def unique_frames(names, processes=None):
+    """Find runs of byte-identical frames in a list of filenames.
+
+    Returns a list of (name, count) pairs, where count is the number
+    of consecutive frames that are identical to name.  Only frames
+    that have the same file size as a neighbour are hashed, and the
+    hashing is done in parallel.
+
+    A timecode file only gives the start time of every frame, and x264
+    derives the duration of the last frame from the gap between the
+    last two timestamps.  The last two entries therefore always have
+    a count of one, splitting a hold at the end if necessary.
+
+    >>> import shutil
+    >>> tmp_dir = tempfile.mkdtemp()
+    >>> def frames(contents):
+    ...     names = []
+    ...     for i, content in enumerate(contents):
+    ...         names.append(os.path.join(tmp_dir, '%d.png' % i))
+    ...         with open(names[-1], 'w') as f:
+    ...             f.write(content)
+    ...     return [(os.path.basename(name), count)
+    ...             for name, count in unique_frames(names)]
+    >>> frames('aaaaaaaaaa')
+    [('0.png', 8), ('8.png', 1), ('9.png', 1)]
+    >>> frames('a')
+    [('0.png', 1)]
+    >>> frames('abcd')
+    [('0.png', 1), ('1.png', 1), ('2.png', 1), ('3.png', 1)]
+    >>> frames('abbbb')
+    [('0.png', 1), ('1.png', 2), ('3.png', 1), ('4.png', 1)]
+    >>> frames('aaaaaaaaaab')
+    [('0.png', 9), ('9.png', 1), ('10.png', 1)]
+    >>> shutil.rmtree(tmp_dir)
+    """
+    names = list(names)
+    sizes = [os.path.getsize(name) for name in names]
+    candidates = [i for i in xrange(len(names))
+                  if (i > 0 and sizes[i-1] == sizes[i])
+                  or (i+1 < len(names) and sizes[i+1] == sizes[i])]
+    keys = [(size, i) for i, size in enumerate(sizes)]
+    if candidates:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(processes)
+        try:
+            hashes = pool.map(_file_hash, [names[i] for i in candidates])
+        finally:
+            pool.close()
+            pool.join()
+        for i, digest in zip(candidates, hashes):
+            keys[i] = (sizes[i], digest)
+    runs = _runs(keys)
+    tail = []
+    while runs and len(tail) < 2:
+        start, length = runs.pop()
+        tail.insert(0, (start + length - 1, 1))
+        if length > 1:
+            runs.append((start, length - 1))
+    return [(names[start], length) for start, length in runs + tail]
+
+
+_RATE_ABBREVIATIONS = {
+    'ntsc': '30000/1001', 'pal': '25', 'qntsc': '30000/1001', 'qpal': '25',
+    'sntsc': '30000/1001', 'spal': '25', 'film': '24', 'ntsc-film': '24000/1001',
+    }
+
+
+def parse_rate(rate):
+    """
+    Parse a frame rate as accepted by the ffmpeg -r option into a
+    Fraction.  Returns None if the rate cannot be parsed.
+
+    >>> parse_rate('24000/1001')
+    Fraction(24000, 1001)
+    >>> parse_rate('ntsc')
+    Fraction(30000, 1001)
+    >>> parse_rate(24)
+    Fraction(24, 1)
+    >>> parse_rate('23.976')
+    Fraction(2997, 125)
+    >>> parse_rate('fast') is None
+    True
+    >>> parse_rate('0') is None
+    True
+    """
+    rate = str(rate)
+    try:
+        result = Fraction(_RATE_ABBREVIATIONS.get(rate, rate))
+    except (ValueError, ZeroDivisionError):
+        return None
+    if result <= 0:
+        return None
+    return result
+
+
+@contextlib.contextmanager
+def timecode_file(frames, fps):
+    """Write a x264 compatible timecode file (format v2) for the given
+    list of (name, count) pairs, as returned by unique_frames.
+
+    Every frame is shown for count/fps seconds, where fps may be a
+    Fraction.  The file is removed on exit.
+
+    >>> with timecode_file([('a', 8), ('a', 1), ('a', 1)], 25) as name:
+    ...     print open(name).read(),
+    # timecode format v2
+    0.000000
+    320.000000
+    360.000000
+    >>> with timecode_file([('a', 1), ('a', 1), ('a', 1)], Fraction(24000, 1001)) as name:
+    ...     print open(name).read(),
+    # timecode format v2
+    0.000000
+    41.708333
+    83.416667
+    """
+    fps = Fraction(fps)
+    handle, filename = tempfile.mkstemp(suffix='.txt')
+    try:
+        with os.fdopen(handle, 'w') as f:
+            f.write('# timecode format v2\n')
+            position = 0
+            for _, count in frames:
+                f.write('%.6f\n' % (position * 1000 / fps))
+                position += count
+        yield filename
+    finally:
+        os.unlink(filename)
+
+
+def _main():
+    import doctest
+    doctest.testmod()
+
+if __name__=='__main__':
+    _main()
@@ -1,18 +1,16 @@
 #!/usr/bin/env python
 
-import optparse
 import os
-import re
 import sys
 
-import asynproc
-import coding
-import sequence
+# The remaining modules are imported where they are needed, to keep
+# the startup time low for scripted invocations.
 
 
 def get_input(name):
     if os.path.isdir(name):
-        sequences = sequence.sequences(os.listdir(name))
+        import sequence
+        sequences = sequence.directory_sequences(name)
         keys = list(sequences)
         if not len(keys):
             raise ValueError('no image sequence found in "%s"' % name)
@@ -37,6 +35,7 @@ def get_input(name):
 
 
 def parse_aspect(aspect):
+    import re
     try:
         result = float(aspect)
     except ValueError:
@@ -64,6 +63,7 @@ def _main():
     #w, h = calculate_format(sys.argv[1], sys.argv[2])
     #print w, h, float(w)/h
     #return
+    import optparse
     parser = optparse.OptionParser("usage: %prog [options] input output")
     parser.add_option("-f", "--force", dest="force", action="store_true",
                       default=False, help="overwrite existing output file")
@@ -74,6 +74,8 @@ def _main():
     parser.add_option("--bitrate", dest="bitrate", help="controls the encoding rate (high|medium|low)")
     parser.add_option("--tune", dest="tune", help="tune the encoding")
     parser.add_option("--preset", dest="preset", help="encoding preset (speed/quality tradeoff)")
+    parser.add_option("--drop-duplicates", dest="drop_duplicates", action="store_true",
+                      default=False, help="encode held frames of a sequence only once")
     options, args = parser.parse_args()
     if len(args) != 2:
         parser.error('one input and one output is required (-h for help)')
@@ -84,6 +86,8 @@ def _main():
     if not options.force and os.path.exists(output_name):
         parser.error('output "%s" already exists (force with -f)' % output_name)
 
+    import coding
+
     x264_options = {}
     mplayer_options = {}
     if options.video_filters:
@@ -110,7 +114,8 @@ def _main():
     h264_options.status = status
     h264_options.options = x264_options
 
-    coding.encode_h264(get_input(input_name), output_name, encode_options=h264_options)
+    coding.encode_h264(get_input(input_name), output_name, encode_options=h264_options,
+                       drop_duplicates=options.drop_duplicates)
     print
 
 
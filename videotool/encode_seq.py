@@ -1,19 +1,17 @@
 #!/usr/bin/env python
 
-import optparse
 import os
-import re
 import sys
 
-import asynproc
-import coding
-import sequence
-
 def _main():
+    import optparse
     parser = optparse.OptionParser("usage: %prog [options] input-dir output-dir")
     parser.add_option("--fps", dest="fps", help="set frames per second")
     parser.add_option("--yuv", dest="yuv", help="output raw yuv instead of encoding h264",
                       action='store_true', default=False)
+    parser.add_option("--drop-duplicates", dest="drop_duplicates",
+                      help="encode held frames of a sequence only once",
+                      action='store_true', default=False)
     options, args = parser.parse_args()
     if len(args) != 2:
         parser.error('one input and one output is required (-h for help)')
@@ -25,6 +23,9 @@ def _main():
 
     os.umask(2)
 
+    import coding
+    import sequence
+
     class DecodeOptions(coding.OptionsBase):
         def error(self, returncode, output):
             print ''.join(output)
@@ -47,7 +48,7 @@ def _main():
     encode_options.options['keyint'] = 24
     encode_options.options['preset'] = 'slower'
 
-    sequences = sequence.sequences(os.listdir(input_dir))
+    sequences = sequence.directory_sequences(input_dir)
     for (head, tail), names in sequences.iteritems():
         names = list(sequence.iterate_sequence(input_dir, head, tail, names))
         output_name = os.path.join(output_dir, os.path.splitext(head[:-1] + tail)[0])
@@ -55,7 +56,8 @@ def _main():
             coding.encode_yuv(names, output_name + '_yuv.mov', decode_options=decode_options)
         else:
             coding.encode_h264(names, output_name + '.mp4', decode_options=decode_options,
-                               encode_options=encode_options)
+                               encode_options=encode_options,
+                               drop_duplicates=options.drop_duplicates)
 
 if __name__=='__main__':
     _main()
@@ -1,7 +1,10 @@
 
+import cPickle as pickle
+import hashlib
 import os
 import re
 import sys
+import time
 
 
 def sequences(names):
@@ -28,6 +31,120 @@ def sequences(names):
     return sequences
 
 
+def _cache_filename(directory):
+    cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    key = hashlib.sha1(os.path.abspath(directory)).hexdigest()
+    return os.path.join(cache_dir, 'videotool', 'sequences', key)
+
+
+def _prune_cache(cache_dir, max_entries):
+    try:
+        names = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)]
+        if len(names) <= max_entries:
+            return
+        names.sort(key=lambda name: os.stat(name).st_mtime)
+        for name in names[:len(names)-max_entries]:
+            os.unlink(name)
+    except OSError:
+        pass
+
+
+def directory_sequences(directory, max_cache_entries=1000):
+    """
+    Same as sequences(os.listdir(directory)), but the result is cached
+    per directory and reused as long as the device, inode and
+    modification time of the directory do not change.
+
+    Directories modified within the last two seconds are not cached,
+    because a change in the same mtime tick would go unnoticed.  Only
+    the most recently written max_cache_entries directories are kept
+    in the cache.
+
+    >>> import shutil, tempfile
+    >>> old_cache_home = os.environ.get('XDG_CACHE_HOME')
+    >>> os.environ['XDG_CACHE_HOME'] = cache_home = tempfile.mkdtemp()
+    >>> def make_directory(age, *names):
+    ...     directory = tempfile.mkdtemp()
+    ...     add_files(directory, age, *names)
+    ...     return directory
+    >>> def add_files(directory, age, *names):
+    ...     for name in names:
+    ...         open(os.path.join(directory, name), 'w').close()
+    ...     if age is not None:
+    ...         os.utime(directory, (time.time() - age,) * 2)
+    >>> directory = make_directory(10, 'f.1.png', 'f.2.png')
+    >>> directory_sequences(directory)
+    {('f.', '.png'): ['1', '2']}
+
+    The cached result is used while the directory is unchanged:
+
+    >>> st = os.stat(directory)
+    >>> add_files(directory, None, 'f.3.png')
+    >>> os.utime(directory, (st.st_atime, st.st_mtime))
+    >>> directory_sequences(directory)
+    {('f.', '.png'): ['1', '2']}
+
+    A new mtime causes a rescan:
+
+    >>> add_files(directory, 5)
+    >>> directory_sequences(directory)
+    {('f.', '.png'): ['1', '2', '3']}
+
+    Recently modified directories are not written to the cache:
+
+    >>> recent = make_directory(None, 'f.1.png', 'f.2.png')
+    >>> directory_sequences(recent)
+    {('f.', '.png'): ['1', '2']}
+    >>> os.path.exists(_cache_filename(recent))
+    False
+
+    Older entries are pruned:
+
+    >>> other = make_directory(10, 'g.1.png', 'g.2.png')
+    >>> directory_sequences(other, max_cache_entries=1)
+    {('g.', '.png'): ['1', '2']}
+    >>> os.listdir(os.path.dirname(_cache_filename(other))) == [
+    ...     os.path.basename(_cache_filename(other))]
+    True
+
+    >>> for name in directory, recent, other, cache_home:
+    ...     shutil.rmtree(name)
+    >>> if old_cache_home is None:
+    ...     del os.environ['XDG_CACHE_HOME']
+    ... else:
+    ...     os.environ['XDG_CACHE_HOME'] = old_cache_home
+    """
+    st = os.stat(directory)
+    key = st.st_dev, st.st_ino, st.st_mtime
+    cache_name = _cache_filename(directory)
+    try:
+        with open(cache_name, 'rb') as f:
+            cached_key, result = pickle.load(f)
+        if cached_key == key:
+            return result
+    except Exception:
+        pass
+    result = sequences(os.listdir(directory))
+    if time.time() - st.st_mtime < 2:
+        return result
+    cache_dir = os.path.dirname(cache_name)
+    tmp_name = '%s.%d' % (cache_name, os.getpid())
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        with open(tmp_name, 'wb') as f:
+            pickle.dump((key, result), f, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_name, cache_name)
+    except (IOError, OSError):
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+    else:
+        _prune_cache(cache_dir, max_cache_entries)
+    return result
+
+
 def iterate_sequence(directory, head, tail, numbers):
     last = None
     for v, n in sorted((int(n), n) for n in numbers):